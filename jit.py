@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+A module providing the njit decorator used for the numeric kernels
+
+Numba is optional. If it is installed, njit compiles the decorated functions
+to machine code on their first call. If it is not installed, njit returns the
+functions unchanged so they run as normal python.
+
+REQUIRED MODULES:
+    NONE
+
+EXAMPLE:
+    from jit import njit, warmup
+
+    @njit(cache=True)
+    def kernel(A, T):
+        return A*T
+
+    warmup(kernel, np.zeros((2, 2)), 0.1)
+"""
+import threading
+
+try:
+    from numba import njit
+    jitEnabled = True
+except ImportError:
+    jitEnabled = False
+
+    def njit(*args, **kwargs):
+        """
+        Stand-in for numba.njit that leaves the function as it is
+
+        Parameters
+        ----------
+        *args : function
+            The function when used as @njit without arguments
+        **kwargs :
+            Numba compile options, ignored
+
+        Returns
+        -------
+        function
+            The undecorated function, or a decorator returning it
+
+        """
+        #used as @njit
+        if (len(args) == 1) and callable(args[0]):
+            return args[0]
+
+        #used as @njit(...)
+        return lambda func: func
+
+
+def warmup(func, *args):
+    """
+    Compiles a jitted function in the background by calling it once.
+
+    Numba compiles on the first call, which would otherwise freeze the GUI on
+    the first button press. The dummy arguments must have the same types as
+    the real ones. Does nothing if numba is not installed.
+
+    Parameters
+    ----------
+    func : function
+        The function decorated with njit
+    *args :
+        Dummy arguments to call the function with
+
+    Returns
+    -------
+    None.
+
+    """
+    if jitEnabled:
+        threading.Thread(target=func, args=args, daemon=True).start()
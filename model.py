@@ -8,6 +8,7 @@ discrete mdel is calculated and displayed.
 
 REQUIRED MODULES:
     value_exchange
+    jit
     
 EXAMPLE:
     root = tk.Tk()
@@ -24,11 +25,17 @@ Created on Thu Mar  2 09:36:51 2023
 
 @author: 22546723
 """
+import warnings
 import numpy as np
+from scipy.linalg import expm, lu_factor, lu_solve, LinAlgWarning
 import tkinter as tk					
 from tkinter import ttk
 
 import value_exchange as ve
+from jit import njit, warmup, jitEnabled
+
+#shared value_exchange instance
+vx = ve.valueExchange
 
 def writeDisc(disc_val, dim, disc_entries):
     """
@@ -52,17 +59,20 @@ def writeDisc(disc_val, dim, disc_entries):
     e_F = disc_entries[0]
     e_g = disc_entries[1]
     
-    #set values from input
-    F = disc_val[0]
-    g = disc_val[1]
+    #set values from input as python floats
+    F = disc_val[0].tolist()
+    g = disc_val[1].tolist()
     
-    #run through both value arrays and display the values
+    #run through both value arrays and build a single Tcl script that 
+    #clears and fills every entry
+    cmds = []
     for r in range(0,dim):
-        e_g[r,0].delete(0, tk.END)
-        e_g[r,0].insert(0,g[r,0])         
+        cmds.append(f"{e_g[r][0]} delete 0 end; {e_g[r][0]} insert 0 {g[r][0]!r}")
         for col in range(0,dim):
-            e_F[r,col].delete(0, tk.END)
-            e_F[r,col].insert(0,F[r,col])
+            cmds.append(f"{e_F[r][col]} delete 0 end; {e_F[r][col]} insert 0 {F[r][col]!r}")
+    
+    #display the values with one call to the Tcl interpreter
+    e_g[0][0].tk.eval("\n".join(cmds))
 
 
 def readCont(cont_entries, dim):
@@ -94,22 +104,292 @@ def readCont(cont_entries, dim):
     e_c = cont_entries[2]
     e_d = cont_entries[3]
     
-    #set values from input
-    A = np.empty(shape=(dim,dim))
-    b = np.empty(shape=(dim,1))
-    c = np.empty(shape=(1,dim))    
+    #read the entered matrices and build the arrays in one go
+    A = np.array([[float(e_A[r][col].get()) for col in range(0,dim)] for r in range(0,dim)])
+    b = np.array([[float(e_b[r][0].get())] for r in range(0,dim)])
+    c = np.array([[float(e_c[0][col].get()) for col in range(0,dim)]])
     d = float(e_d.get())
-    
-    #loop through the entered matrices and store the values
-    for r in range(0,dim):
-        b[r,0] = float(e_b[r,0].get())
-        c[0,r] = float(e_c[0,r].get())
-        for col in range(0,dim):
-            A[r,col] = float(e_A[r,col].get())        
         
     return A, b, c, d
 
-def calcDisc(cont_val, T, dim):
+@njit(cache=True)
+def discTaylorCore(A, b, T):
+    """
+    Numeric core of discTaylor, compiled with numba when it is available.
+    
+    Written with explicit loops, which are faster than np.matmul for the 
+    small matrices once compiled.
+
+    Parameters
+    ----------
+    A : array of double, size [dim][dim]
+        Continuous system matrix
+    b : array of double, size [dim][1]
+        Continuous input matrix
+    T : double
+        Sample time
+
+    Returns
+    -------
+    F : array of double, size [dim][dim]
+        Discrete system matrix
+    g : array of double, size [dim][1]
+        Discrete input matrix
+
+    """
+    dim = A.shape[0]
+    F = np.empty((dim, dim))
+    psi = np.empty((dim, dim))
+    g = np.empty((dim, 1))
+    
+    #calculate F = I + AT + (AT)^2/2 and psi = I + AT/2 + (AT)^2/6
+    for r in range(dim):
+        for col in range(dim):
+            AT2 = 0.0
+            for j in range(dim):
+                AT2 += A[r,j]*A[j,col]
+            AT2 *= T*T
+            AT = A[r,col]*T
+            F[r,col] = AT + 0.5*AT2
+            psi[r,col] = 0.5*AT + AT2/6.0
+        F[r,r] += 1.0
+        psi[r,r] += 1.0
+    
+    #calculate g = T*psi*b
+    for r in range(dim):
+        temp = 0.0
+        for j in range(dim):
+            temp += psi[r,j]*b[j,0]
+        g[r,0] = T*temp
+    
+    return F, g
+
+#read-only identity matrices, keyed by dimension
+eyeCache = {}
+
+def eye(dim):
+    """
+    Returns a shared, read-only identity matrix of the given dimension.
+    
+    Only use it where the result is not modified in place, e.g. I + AT.
+
+    Parameters
+    ----------
+    dim : int
+        Dimension of the identity matrix
+
+    Returns
+    -------
+    Im : array of double, size [dim][dim]
+        Identity matrix
+
+    """
+    Im = eyeCache.get(dim)
+    if Im is None:
+        Im = np.eye(dim)
+        Im.flags.writeable = False
+        eyeCache[dim] = Im
+    return Im
+
+#generated Taylor discretisation functions, keyed by dimension
+discTaylorCache = {}
+
+def genDiscTaylor(dim):
+    """
+    Generates a Taylor discretisation function for one fixed dimension.
+    
+    The matrix products are fully unrolled into straight-line code, which 
+    avoids the loop and indexing overhead of discTaylorCore when it is not 
+    compiled by numba. Only sensible for small dimensions.
+
+    Parameters
+    ----------
+    dim : int
+        Dimension of the F/A matrices
+
+    Returns
+    -------
+    function
+        Function (A, b, T) -> (F, g) with the same result as discTaylorCore
+
+    """
+    idx = range(dim)
+    lines = [f"def discTaylor{dim}(A, b, T):",
+             "    A = A.tolist()",
+             "    b = b.tolist()"]
+    
+    #AT and (AT)^2 as scalars
+    for r in idx:
+        for col in idx:
+            lines.append(f"    a{r}{col} = A[{r}][{col}]*T")
+    for r in idx:
+        for col in idx:
+            terms = " + ".join(f"a{r}{j}*a{j}{col}" for j in idx)
+            lines.append(f"    s{r}{col} = {terms}")
+    
+    #F = I + AT + (AT)^2/2 and psi = I + AT/2 + (AT)^2/6
+    rows = []
+    for r in idx:
+        row = []
+        for col in idx:
+            diag = "1.0 + " if r == col else ""
+            row.append(f"{diag}a{r}{col} + 0.5*s{r}{col}")
+            lines.append(f"    p{r}{col} = {diag}0.5*a{r}{col} + s{r}{col}/6.0")
+        rows.append("[" + ", ".join(row) + "]")
+    lines.append("    F = np.array([" + ", ".join(rows) + "])")
+    
+    #g = T*psi*b
+    rows = []
+    for r in idx:
+        terms = " + ".join(f"p{r}{j}*b[{j}][0]" for j in idx)
+        rows.append(f"[T*({terms})]")
+    lines.append("    g = np.array([" + ", ".join(rows) + "])")
+    lines.append("    return F, g")
+    
+    #compile the source and return the new function
+    namespace = {"np": np}
+    exec(compile("\n".join(lines), f"<discTaylor{dim}>", "exec"), namespace)
+    return namespace[f"discTaylor{dim}"]
+
+def discTaylor(A, b, T, dim):
+    """
+    Approximates the zero-order hold discretisation with a second order 
+    Taylor series
+
+    Parameters
+    ----------
+    A : array of double, size [dim][dim]
+        Continuous system matrix
+    b : array of double, size [dim][1]
+        Continuous input matrix
+    T : double
+        Sample time
+    dim : int
+        Dimension of the F/A matrices
+
+    Returns
+    -------
+    F : array of double, size [dim][dim]
+        Discrete system matrix
+    g : array of double, size [dim][1]
+        Discrete input matrix
+
+    """
+    #without numba, use unrolled code generated for small dimensions
+    if (not jitEnabled) and (dim <= 4):
+        func = discTaylorCache.get(dim)
+        if func is None:
+            func = genDiscTaylor(dim)
+            discTaylorCache[dim] = func
+        return func(A, b, float(T))
+    
+    #make sure the core always gets the same types
+    A = np.ascontiguousarray(A, dtype=np.float64)
+    b = np.ascontiguousarray(b, dtype=np.float64)
+    
+    return discTaylorCore(A, b, float(T))
+
+def discZOH(A, b, T, dim):
+    """
+    Calculates the exact zero-order hold discretisation.
+    
+    The matrix exponential of the augmented matrix [[A, b], [0, 0]]*T 
+    contains F in its top left block and g in its top right column.
+
+    Parameters
+    ----------
+    A : array of double, size [dim][dim]
+        Continuous system matrix
+    b : array of double, size [dim][1]
+        Continuous input matrix
+    T : double
+        Sample time
+    dim : int
+        Dimension of the F/A matrices
+
+    Returns
+    -------
+    F : array of double, size [dim][dim]
+        Discrete system matrix
+    g : array of double, size [dim][1]
+        Discrete input matrix
+
+    """
+    #a diagonal A decouples the states, giving the closed form 
+    #F = diag(exp(lambda*T)) and g = b*(exp(lambda*T) - 1)/lambda
+    lam = np.diag(A)
+    if np.count_nonzero(A - np.diag(lam)) == 0:
+        F = np.diag(np.exp(lam*T))
+        
+        #(exp(lambda*T) - 1)/lambda tends to T as lambda goes to zero
+        small = np.abs(lam) < 1e-12
+        gain = np.where(small, T, np.expm1(lam*T)/np.where(small, 1.0, lam))
+        g = b*gain.reshape(-1,1)
+        
+        return F, g
+    
+    #build the augmented matrix
+    M = np.zeros(shape=(dim+1,dim+1))
+    M[:dim,:dim] = A*T
+    M[:dim,dim:] = b*T
+    
+    #take the matrix exponential and slice out F and g
+    eM = expm(M)
+    F = eM[:dim,:dim]
+    g = eM[:dim,dim:]
+    
+    return F, g
+
+def discTustin(A, b, T, dim):
+    """
+    Calculates the discretisation with the Tustin (bilinear) transform
+    
+    F = (I + AT/2)(I - AT/2)^(-1) and g = (I - AT/2)^(-1)bT
+
+    Parameters
+    ----------
+    A : array of double, size [dim][dim]
+        Continuous system matrix
+    b : array of double, size [dim][1]
+        Continuous input matrix
+    T : double
+        Sample time
+    dim : int
+        Dimension of the F/A matrices
+
+    Returns
+    -------
+    F : array of double, size [dim][dim]
+        Discrete system matrix
+    g : array of double, size [dim][1]
+        Discrete input matrix
+
+    """
+    #calculate (I + AT/2) and (I - AT/2) in fortran order, scipy copies
+    #c-ordered arrays before passing them to LAPACK even with overwrite set
+    Im = eye(dim)
+    AT2 = 0.5*A*T
+    M1 = np.add(Im, AT2, order='F')
+    M2 = np.subtract(Im, AT2, order='F')
+    
+    #factorise (I - AT/2) once, in place, and reuse it for both solves.
+    #(I + AT/2) and (I - AT/2) commute, so F = (I - AT/2)^(-1)(I + AT/2)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", LinAlgWarning)
+        lu = lu_factor(M2, overwrite_a=True, check_finite=False)
+    
+    #(I - AT/2) is singular when A has an eigenvalue of 2/T. lu_factor only
+    #warns, so raise like np.linalg.solve so no inf/nan values are written
+    #to the entries
+    if np.any(lu[0].diagonal() == 0):
+        raise np.linalg.LinAlgError("Singular matrix")
+    
+    F = lu_solve(lu, M1, overwrite_b=True, check_finite=False)
+    g = lu_solve(lu, b*T, overwrite_b=True, check_finite=False)
+    
+    return F, g
+
+def calcDisc(cont_val, T, dim, method="ZOH"):
     """
     Calculate the discrete model from the continouos one
 
@@ -121,6 +401,8 @@ def calcDisc(cont_val, T, dim):
         Sample time
     dim : int
         Dimension of the F/A matrices
+    method : string
+        Discretisation method, "ZOH", "Tustin" or "Taylor"
 
     Returns
     -------
@@ -140,15 +422,13 @@ def calcDisc(cont_val, T, dim):
     c = cont_val[2]
     d = cont_val[3]
     
-    #calculate F matrix
-    Im = np.identity(dim)
-    F = Im + A*T + 0.5*np.matmul(A*T, A*T)
-    
-    #calculate psi matrix
-    psi = Im + 0.5*A*T + (1/6)*np.matmul(A*T, A*T)
-    
-    #calculate g matrix
-    g = T*np.matmul(psi,b)
+    #calculate the F and g matrices with the selected method
+    if method == "Tustin":
+        F, g = discTustin(A, b, T, dim)
+    elif method == "Taylor":
+        F, g = discTaylor(A, b, T, dim)
+    else:
+        F, g = discZOH(A, b, T, dim)
     
     return F, g, c, d
     
@@ -179,26 +459,19 @@ def readDisc(disc_entries, dim):
     #assign entries from input
     e_F = disc_entries[0]
     e_g = disc_entries[1]
-    e_c = disc_entries[3]
-    e_d = disc_entries[0]
+    e_c = disc_entries[2]
+    e_d = disc_entries[3]
     
-    #initialise discrete values
-    F = np.empty(shape=(dim,dim))
-    g = np.empty(shape=(dim,1))
-    c = np.empty(shape=(1,dim))
+    #read the inputs and build the arrays in one go
+    F = np.array([[float(e_F[r][col].get()) for col in range(0,dim)] for r in range(0,dim)])
+    g = np.array([[float(e_g[r][0].get())] for r in range(0,dim)])
+    c = np.array([[float(e_c[0][col].get()) for col in range(0,dim)]])
     d = float(e_d.get())
-    
-    #loop through the inputs and assign values
-    for r in range(0,dim):
-        g[r,0] = float(e_g[r,0].get())
-        c[0,r] = float(e_c[0,r].get())
-        for col in range(0,dim):
-            F[r,col] = float(e_F[r,col].get())         
         
     return F, g, c, d
     
     
-def calcModel(v, cont_entries, disc_entries, dim): 
+def calcModel(v, cb_method, cont_entries, disc_entries, dim): 
     """
     Calculates and displays the discrete model from the continuous matrices or read it from 
     the entries. Also sets the value_exchange model
@@ -207,6 +480,8 @@ def calcModel(v, cont_entries, disc_entries, dim):
     ----------
     v : tk.IntVar
         Variable indicating the radio group selection
+    cb_method : ttk.Combobox
+        Combobox indicating the discretisation method
     cont_entries : list of ttk.Entry
         List containing the continuous entry fields [e_A, e_b, e_c, e_d]
     disc_entries : list of ttk.Entry
@@ -220,15 +495,21 @@ def calcModel(v, cont_entries, disc_entries, dim):
 
     """
     #read the radio group
-    if v.get()==2:
+    disc_val = None
+    selection = v.get()
+    if selection==2:
         #calculate and display the discrete matrices
-        T = ve.valueExchange.getPoles()[2]
+        T = vx.T
         cont_val = readCont(cont_entries, dim)
-        disc_val = calcDisc(cont_val, T, dim)
+        disc_val = calcDisc(cont_val, T, dim, cb_method.get())
         writeDisc(disc_val, dim, disc_entries)
-    if v.get()==1:
+    elif selection==1:
         #read the discrete matrix
         disc_val = readDisc(disc_entries, dim)
+    
+    #nothing to set if neither model type is selected
+    if disc_val is None:
+        return
         
     #get the matrices from the read/calculated values
     F = disc_val[0]
@@ -237,7 +518,7 @@ def calcModel(v, cont_entries, disc_entries, dim):
     d = disc_val[3]
         
     #set the value_exchange model
-    ve.valueExchange.setModel(F, g, c, d)
+    vx.setModel(F, g, c, d)
 
 def spaceLabels(labels, dim):
     """
@@ -276,7 +557,7 @@ def spaceLabels(labels, dim):
     l_gap.grid(row=dim+3, column=0, pady=2) 
 
 
-def spaceInputs(frame, dim, v):
+def spaceInputs(frame, dim, v, cb_method):
     """
     Display the entry fields and calculate button with the correct spacing
 
@@ -288,18 +569,21 @@ def spaceInputs(frame, dim, v):
         Dimension of the F/A matrices
     v : tk.IntVar
         Variable indicating the radio group selection
+    cb_method : ttk.Combobox
+        Combobox indicating the discretisation method
 
     Returns
     -------
-    None.
+    list
+        The created widgets [e_F, e_g, e_A, e_b, e_c, e_d, b_calc_disc]
 
     """
     #initialize the entry field matrices
-    e_F = np.empty(shape=(dim,dim), dtype=ttk.Entry)
-    e_g = np.empty(shape=(dim,1), dtype=ttk.Entry)
-    e_A = np.empty(shape=(dim,dim), dtype=ttk.Entry)
-    e_b = np.empty(shape=(dim,1), dtype=ttk.Entry)
-    e_c = np.empty(shape=(1,dim), dtype=ttk.Entry)
+    e_F = [[None]*dim for _ in range(dim)]
+    e_g = [[None] for _ in range(dim)]
+    e_A = [[None]*dim for _ in range(dim)]
+    e_b = [[None] for _ in range(dim)]
+    e_c = [[None]*dim]
     e_d = ttk.Entry(frame)
     
     #populate and display the F matrix entries
@@ -307,32 +591,32 @@ def spaceInputs(frame, dim, v):
         for col in range(1,dim+1):
             ent = ttk.Entry(frame)
             ent.grid(row=r, column=col, padx=2, pady=2)
-            e_F[r-2,col-1] = ent
+            e_F[r-2][col-1] = ent
     
     #populate and display the g matrix entries
     for r in range(2,dim+2):
         ent = ttk.Entry(frame)
         ent.grid(row=r, column=dim+2, padx=2, pady=2)
-        e_g[r-2,0] = ent    
+        e_g[r-2][0] = ent    
 
     #populate and display the A matrix entries
     for r in range(2,dim+2):
         for col in range(dim+4,2*dim+4):
             ent = ttk.Entry(frame)
             ent.grid(row=r, column=col, padx=2, pady=2)
-            e_A[r-2,col-(dim+4)] = ent
+            e_A[r-2][col-(dim+4)] = ent
 
     #populate and display the b matrix entries
     for r in range(2,dim+2):
         ent = ttk.Entry(frame)
         ent.grid(row=r, column=2*dim+6, padx=2, pady=2)
-        e_b[r-2,0] = ent 
+        e_b[r-2][0] = ent 
 
     #populate and display the c matrix entries
     for col in range(1,dim+1):
         ent = ttk.Entry(frame)
         ent.grid(row=dim+4, column=col, padx=2, pady=2)
-        e_c[0,col-1] = ent   
+        e_c[0][col-1] = ent   
  
     #display the d entry field
     e_d.grid(row=dim+4, column=dim+2, padx=2, pady=2)
@@ -342,11 +626,36 @@ def spaceInputs(frame, dim, v):
     disc_entries = [e_F, e_g, e_c, e_d]
     
     #add calculate button
-    b_calc_disc = ttk.Button(frame, text="Set discrete model", command=lambda: calcModel(v, cont_entries, disc_entries, dim))    
+    b_calc_disc = ttk.Button(frame, text="Set discrete model", command=lambda: calcModel(v, cb_method, cont_entries, disc_entries, dim))    
     b_calc_disc.grid(row=dim+7, column=0, pady=2)
+    
+    return [e_F, e_g, e_A, e_b, e_c, e_d, b_calc_disc]
+
+def inputWidgets(inputs):
+    """
+    Flattens the grouped input widgets of one dimension into a single list
+
+    Parameters
+    ----------
+    inputs : list
+        Widgets returned by spaceInputs [e_F, e_g, e_A, e_b, e_c, e_d, b_calc_disc]
+
+    Returns
+    -------
+    widgets : list of ttk.Widget
+        All the entry fields and the calculate button
 
+    """
+    #flatten the entry matrices and add the single widgets
+    widgets = []
+    for e_X in inputs[0:5]:
+        for row in e_X:
+            widgets.extend(row)
+    widgets.extend(inputs[5:])
+    
+    return widgets
 
-def setDim(frame, e_dim, labels, v): 
+def setDim(frame, e_dim, labels, v, cb_method): 
     """
     Reads the matrix dimension entry field, spaces the labels and the entries.
     Also sets the dimension in value_exchange
@@ -361,6 +670,8 @@ def setDim(frame, e_dim, labels, v):
         List containing the labels 
     v : tk.IntVar
         Variable indicating the radio group selection
+    cb_method : ttk.Combobox
+        Combobox indicating the discretisation method
 
     Returns
     -------
@@ -370,12 +681,26 @@ def setDim(frame, e_dim, labels, v):
     #read dimension
     dim=int(e_dim.get()) 
     
-    #space the labels and entries
+    #space the labels
     spaceLabels(labels, dim)
-    spaceInputs(frame, dim, v)
+    
+    #hide the entries of the previously displayed dimension
+    cache = frame._entry_cache
+    if (frame._entry_dim is not None) and (frame._entry_dim != dim):
+        for widget in inputWidgets(cache[frame._entry_dim]):
+            widget.grid_remove()
+    
+    #reuse the entries of a dimension that was set before, otherwise create them
+    if dim in cache:
+        if not (frame._entry_dim == dim):
+            for widget in inputWidgets(cache[dim]):
+                widget.grid()
+    else:
+        cache[dim] = spaceInputs(frame, dim, v, cb_method)
+    frame._entry_dim = dim
     
     #set the dimension in value_exchange
-    ve.valueExchange.setSize(dim)
+    vx.setSize(dim)
         
 def setupModel(frame):
     """
@@ -403,6 +728,11 @@ def setupModel(frame):
             value = value)
         rb_dc.grid(row=0, column=value-1, pady=2)
     
+    #discretisation method setup
+    cb_method = ttk.Combobox(frame, values=["ZOH", "Tustin", "Taylor"], state="readonly")
+    cb_method.current(0)
+    cb_method.grid(row=0, column=2, pady=2, padx=10)
+    
     #dimension label setup
     l_dim = ttk.Label(frame, text="A/F dimensions:")
     l_dim.grid(row=1, column=0, pady=2)
@@ -425,10 +755,17 @@ def setupModel(frame):
     #group labels
     labels = [l_F, l_g, l_A, l_b, l_c, l_d, l_gap]
     
+    #entry fields are created once per dimension and kept for reuse
+    frame._entry_cache = {}
+    frame._entry_dim = None
+    
     #set dimension button setup
-    b_set_dim = ttk.Button(frame, text="set dimensions", command=lambda: setDim(frame, e_dim, labels, v))
+    b_set_dim = ttk.Button(frame, text="set dimensions", command=lambda: setDim(frame, e_dim, labels, v, cb_method))
     b_set_dim.grid(row=1, column=2, pady=2, padx=10)
     
     #initial label spacing
     dim = 1
-    spaceLabels(labels, dim)
\ No newline at end of file
+    spaceLabels(labels, dim)
+    
+    #compile the discretisation kernel while the GUI is idle
+    warmup(discTaylorCore, np.zeros((2,2)), np.zeros((2,1)), 0.1)
\ No newline at end of file
@@ -31,30 +31,37 @@ from tkinter import ttk
 
 import value_exchange as ve
 
+#shared value_exchange instance
+vx = ve.valueExchange
+
 def calcPoles(s_sigma, s_wd, T):
     """
     Calculates the z-poles from the s-poles and sample time
 
+    Also accepts arrays of s-poles and/or sample times, in which case the 
+    z-poles are calculated element wise.
+
     Parameters
     ----------
-    s_sigma : double
+    s_sigma : double or array of double
         S-poles sigma value
-    s_wd : double
+    s_wd : double or array of double
         S-poles w_d value
-    T : double
+    T : double or array of double
         Sample time
 
     Returns
     -------
-    z_sigma : double
+    z_sigma : double or array of double
         Calculated sigma value
-    z_wd : double
+    z_wd : double or array of double
         Calculated w_d value
 
     """
-    #calculate z-poles
-    z_sigma = np.exp(s_sigma*T) * np.cos(s_wd*T)
-    z_wd = np.exp(s_sigma*T) * np.sin(s_wd*T)
+    #calculate z-poles as the real and imaginary parts of exp(sT)
+    z = np.exp((s_sigma + 1j*s_wd)*T)
+    z_sigma = z.real
+    z_wd = z.imag
     
     return z_sigma, z_wd
 
@@ -81,30 +88,7 @@ def readZPoles(z_entries, e_T):
     T = e_T.get()
     
     #set poles in value_exchange
-    ve.valueExchange.setPoles(z_sigma, z_wd, T)
-
-def clearPoles(z_entries, T): 
-    """
-    Clear the z-pole entries and setthe value_exchange poles to zero
-
-    Parameters
-    ----------
-    z_entries : list of ttk.Entry
-        List containing the z-pole entries [z_sigma, z_wd]
-    T : double
-        Sample time
-
-    Returns
-    -------
-    None.
-
-    """
-    #set entry field values
-    z_entries[0].delete(0, tk.END)
-    z_entries[1].delete(0, tk.END) 
-    
-    #set poles in value exchange
-    ve.valueExchange.setPoles(0, 0, T)
+    vx.setPoles(z_sigma, z_wd, T)
 
 def readPolesFromReq(s_entries):
     """
@@ -122,13 +106,14 @@ def readPolesFromReq(s_entries):
 
     """
     #get poles
-    [s_sigma, s_wd] = ve.valueExchange.getRequirements()
+    [s_sigma, s_wd] = vx.getRequirements()
     
     s_sigma = -s_sigma
     
     #display poles
-    s_entries[0].insert(0, s_sigma)
-    s_entries[1].insert(0, s_wd)
+    for entry, value in zip(s_entries, (s_sigma, s_wd)):
+        entry.delete(0, tk.END)
+        entry.insert(0, value)
     
     
 def readPoles(s_entries, e_T):
@@ -181,18 +166,16 @@ def processPoles(z_entries, s_entries, e_T):
     #read s-poles and sample time
     [s_sigma, s_wd, T] = readPoles(s_entries, e_T)
     
-    #clear z-pole entries
-    clearPoles(z_entries, T)
-    
     #calculate z-poles
     [z_sigma, z_wd] = calcPoles(s_sigma, s_wd, T)
     
-    #display z-poles
-    z_entries[0].insert(0, z_sigma)
-    z_entries[1].insert(0, z_wd)    
+    #replace the z-pole entries with the new values
+    for entry, value in zip(z_entries, (z_sigma, z_wd)):
+        entry.delete(0, tk.END)
+        entry.insert(0, value)
     
     #set value_exchange poles
-    ve.valueExchange.setPoles(z_sigma, z_wd, T)
+    vx.setPoles(z_sigma, z_wd, T)
 
 def setupPoles(frame):
     """
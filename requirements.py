@@ -9,6 +9,7 @@ them in the relevant entry fields.
 
 REQUIRED MODULES:
     value_exchange
+    jit
     
 EXAMPLE:
     root = tk.Tk()
@@ -25,11 +26,73 @@ Created on Thu Mar  2 09:05:21 2023
 
 @author: 22546723
 """
-import numpy as np
+from math import sqrt, pi, inf
 import tkinter as tk					
 from tkinter import ttk
 
 import value_exchange as ve
+from jit import njit, warmup
+
+#shared value_exchange instance
+vx = ve.valueExchange
+
+@njit(cache=True)
+def calcRequirementsCore(wn, zeta, ts, tr, tp, wd, sigma):
+    """
+    Numeric core of calcRequirements, compiled with numba when it is available.
+
+    Parameters
+    ----------
+    wn : double
+        Entered w_n value
+    zeta : double
+        Entered zeta value
+    ts : double
+        Entered 2% t_s value
+    tr : double
+        Entered t_r value
+    tp : double
+        Entered t_p value
+    wd : double
+        Entered w_d value
+    sigma : double
+        Entered sigma value
+
+    Returns
+    -------
+    wn, zeta, ts, tr, tp, wd, sigma : double
+        Calculated time domain requirements
+
+    """
+    #calculate missing values
+    if  (not (ts == 0)) and (sigma == 0):
+        sigma = 4/ts    
+        
+    if  (not (tp == 0)) and (wd == 0):
+        wd = pi/tp
+        
+    if (wn == 0):
+        if not(sigma == 0):
+            wn = sigma/zeta
+        
+    if (zeta == 0):
+        if not(sigma == 0):
+            zeta = sigma/wn
+            
+    if (not(wn == 0)) and (not(zeta == 0)):
+        sigma = zeta*wn
+        ts = 4/sigma
+        tr = 1.8/wn
+        
+        #a critically or overdamped system does not oscillate or overshoot
+        if zeta*zeta < 1.0:
+            wd = wn*sqrt(1.0 - zeta*zeta)
+            tp = pi/wd
+        else:
+            wd = 0.0
+            tp = inf
+        
+    return wn, zeta, ts, tr, tp, wd, sigma
 
 def calcRequirements(requirements):
     """
@@ -63,37 +126,37 @@ def calcRequirements(requirements):
 
     """
     #set individual requirements from array
-    wn=requirements[0]
-    zeta=requirements[1]
-    ts=requirements[2]
-    tr=requirements[3]
-    tp=requirements[4]
-    wd=requirements[5]
-    sigma=requirements[6]
+    wn=float(requirements[0])
+    zeta=float(requirements[1])
+    ts=float(requirements[2])
+    tr=float(requirements[3])
+    tp=float(requirements[4])
+    wd=float(requirements[5])
+    sigma=float(requirements[6])
         
     #calculate missing values
-    if  (not (ts == 0)) and (sigma == 0):
-        sigma = 4/ts    
-        
-    if  (not (tp == 0)) and (wd == 0):
-        wd = np.pi/tp
-        
-    if (wn == 0):
-        if not(sigma == 0):
-            wn = sigma/zeta
-        
-    if (zeta == 0):
-        if not(sigma == 0):
-            zeta = sigma/wn
-            
-    if (not(wn == 0)) and (not(zeta == 0)):
-        sigma = zeta*wn
-        wd = wn*np.sqrt(1-np.square(zeta))
-        ts = 4/sigma
-        tp = np.pi/wd
-        tr = 1.8/wn
-        
-    return wn, zeta, ts, tr, tp, wd, sigma
+    return calcRequirementsCore(wn, zeta, ts, tr, tp, wd, sigma)
+
+def readEntry(entry):
+    """
+    Reads a single entry field, returning zero if it is blank.
+
+    Parameters
+    ----------
+    entry : ttk.Entry
+        The entry field to read
+
+    Returns
+    -------
+    double
+        Read value, zero if nothing was entered
+
+    """
+    #get the text once and only parse it if something was entered
+    text = entry.get()
+    if text:
+        return float(text)
+    return 0.0
 
 def readRequirements(entries):
     """
@@ -131,30 +194,14 @@ def readRequirements(entries):
     e_wd = entries[5]
     e_sigma  = entries[6]   
     
-    #set initial values (unentered values can't be blank)
-    wn=0
-    zeta=0
-    ts=0
-    tr=0
-    tp=0
-    wd=0
-    sigma=0
-    
-    #read entry values
-    if e_tr.get():
-        tr = float(e_tr.get()) 
-    if e_wn.get():
-        wn = float(e_wn.get()) 
-    if e_zeta.get():
-        zeta = float(e_zeta.get())   
-    if e_ts.get():
-        ts = float(e_ts.get())
-    if e_tp.get():
-        tp = float(e_tp.get())
-    if e_wd.get():
-        wd = float(e_wd.get()) 
-    if e_sigma.get():
-        sigma = float(e_sigma.get())
+    #read entry values (unentered values are read as zero)
+    tr = readEntry(e_tr)
+    wn = readEntry(e_wn)
+    zeta = readEntry(e_zeta)
+    ts = readEntry(e_ts)
+    tp = readEntry(e_tp)
+    wd = readEntry(e_wd)
+    sigma = readEntry(e_sigma)
         
     return wn, zeta, ts, tr, tp, wd, sigma 
 
@@ -175,32 +222,11 @@ def writeRequirements(requirements, entries):
     None.
 
     """
-    #set individual entries from array
-    e_wn = entries[0]
-    e_zeta = entries[1]
-    e_ts = entries[2]
-    e_tr = entries[3]
-    e_tp = entries[4]
-    e_wd = entries[5]
-    e_sigma  = entries[6] 
-    
-    #set individual requirements from array
-    wn=requirements[0]
-    zeta=requirements[1]
-    ts=requirements[2]
-    tr=requirements[3]
-    tp=requirements[4]
-    wd=requirements[5]
-    sigma=requirements[6]    
-    
-    #write values to entries
-    e_wn.insert(0, wn)
-    e_zeta.insert(0, zeta)
-    e_ts.insert(0, ts)
-    e_tr.insert(0, tr)
-    e_tp.insert(0, tp)
-    e_wd.insert(0, wd)
-    e_sigma.insert(0, sigma)
+    #replace the entry values with the requirements, the entries and 
+    #requirements are in the same order
+    for entry, value in zip(entries, requirements):
+        entry.delete(0, tk.END)
+        entry.insert(0, value)
     
 
 def clearRequirements(entries):
@@ -218,11 +244,11 @@ def clearRequirements(entries):
 
     """
     #loops through the entries and clears them
-    for i in range(0, len(entries)):
-        entries[i].delete(0, tk.END)
+    for entry in entries:
+        entry.delete(0, tk.END)
         
     #set the value_exchange requirements to zero
-    ve.valueExchange.setRequirements(0, 0)
+    vx.setRequirements(0, 0)
     
 def processRequirements(entries):
     """
@@ -248,7 +274,7 @@ def processRequirements(entries):
     writeRequirements(requirements, entries)
     
     #set the value_exchange requirements
-    ve.valueExchange.setRequirements(requirements[6], requirements[5])
+    vx.setRequirements(requirements[6], requirements[5])
 
 def setupRequirements(frame): 
     """
@@ -309,4 +335,7 @@ def setupRequirements(frame):
     b_clear_req = ttk.Button(frame, text = "clear", command=lambda: clearRequirements(entries))
 
     b_calculate_req.grid(row = 7, column = 1, pady = 5)
-    b_clear_req.grid(row = 7, column = 0, pady = 5) 
+    b_clear_req.grid(row = 7, column = 0, pady = 5)
+    
+    #compile the requirements kernel while the GUI is idle
+    warmup(calcRequirementsCore, 1.0, 0.5, 0.0, 0.0, 0.0, 0.0, 0.0) 
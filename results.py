@@ -8,6 +8,7 @@ closed loop poles and sample time.
 
 REQUIRED MODULES:
     value_exchange
+    jit
     
 EXAMPLE:
     root = tk.Tk()
@@ -24,24 +25,29 @@ Created on Thu Mar  2 10:03:08 2023
 
 @author: 22546723
 """
+import functools
 import numpy as np
-import sympy as sp				
 from tkinter import ttk
 
 import value_exchange as ve
+from jit import njit, warmup, jitEnabled
 
+#shared value_exchange instance
+vx = ve.valueExchange
 
-def calcK(F, poles, U, dim):
+
+def calcK(ol_coeffs, poles, U, dim):
     """
     Calculates the discrete feedback controller.
     
-    Uses the discrete model, poles dimension and controllability matrix of a
-    discrete system to calculate the feedback controller
+    Uses the open loop characteristic equation, poles dimension and 
+    controllability matrix of a discrete system to calculate the feedback 
+    controller
 
     Parameters
     ----------
-    F : array of double, size [dim][dim]
-        Discrete system matrix
+    ol_coeffs : array of double, size [dim+1]
+        Open loop equation det(zI - F) coefficients, highest power first
     poles : list of double
         System poles in z-plane
     U : array of double, size [dim][dim]
@@ -61,55 +67,178 @@ def calcK(F, poles, U, dim):
     """
     
     #set values from inputs
-    z_sigma = poles[0]
-    z_wd = poles[1]
+    z_sigma = float(poles[0])
+    z_wd = float(poles[1])
     
     #initialize matrices
-    k_c = np.zeros(shape=(1, dim))
-    k = np.zeros(shape=(1, dim))
-    P = np.zeros(shape=(dim, dim))
-    U_c = np.zeros(shape=(dim, dim))
-    
-    #NOTE: alpha is a symbolic array
-    a = sp.zeros(dim)
-    alpha = sp.zeros(dim)    
-    
-    #get open loop equation
-    #NOTE: this gives a symbolic equation
-    z = sp.Symbol('z')
-    F_sym = sp.Matrix(F)
-    Id = sp.eye(dim)
-    temp = z*Id - F_sym
-    ol_eqn = temp.det()
-    
-    #get closed loop equation
-    cl_eqn = (z - z_sigma - sp.I*z_wd)*(z - z_sigma + sp.I*z_wd)
-    cl_eqn = cl_eqn.as_poly()
-    cl_eqn = cl_eqn.as_expr()
+    k_c = np.empty(shape=(1, dim), dtype=np.float64)
+    U_c = np.zeros(shape=(dim, dim), dtype=np.float64)
+    
+    #get the closed loop equation (z - z_sigma - j*z_wd)(z - z_sigma + j*z_wd)
+    #= z^2 - 2*z_sigma*z + z_sigma^2 + z_wd^2 coefficients, padded with 
+    #leading zeros to the system order
+    cl = np.array([1.0, -2*z_sigma, z_sigma**2 + z_wd**2])
+    cl_coeffs = np.zeros(dim+1)
+    n = min(len(cl), dim+1)
+    cl_coeffs[-n:] = cl[-n:]
         
-    #get the coefficients and k_c from the open and closed loop equations
-    for i in range(0, dim):
-        a[dim-1- i] = cl_eqn.coeff(z,i)
-        alpha[dim-1- i] = ol_eqn.coeff(z,i)
-        k_c[0, i] = a[0,dim-1- i] - alpha[0,dim-1- i]
+    #k_c holds the coefficient differences from z^0 up to z^(dim-1)
+    k_c[0] = (cl_coeffs - ol_coeffs)[:0:-1]
  
-    #change array type from a symbolic array to a numpy array
-    alpha = np.array(alpha).astype(np.float64) 
+    #alpha holds the open loop coefficients from z^(dim-1) down to z^0
+    alpha = ol_coeffs[1:].reshape(1, dim)
     
-    #calculate U_c^(-1)
-    for i in range(0, dim):
-        for j in range(0,dim):
-            if j<(dim-i-1):
-                U_c[i,j] = alpha[0,dim-2-j-i]
-            if j == dim-i-1:
-                U_c[i,j] = 1
+    #calculate U_c^(-1). Element [i,j] is alpha[0, dim-2-i-j] above the 
+    #anti-diagonal, one on the anti-diagonal and zero below it
+    idx = dim - 2 - np.add.outer(np.arange(dim), np.arange(dim))
+    above = idx >= 0
+    U_c[above] = alpha[0, idx[above]]
+    U_c[idx == -1] = 1
     
-    #calculate P and use it to get k
-    P = np.matmul(U, U_c)
-    k = np.matmul(k_c,np.linalg.inv(P))
+    #calculate P and use it to get k = k_c*P^(-1), solving P'k' = k_c'
+    #instead of inverting P
+    P = U @ U_c
+    k = np.linalg.solve(P.T, k_c.T).T
     
     return k, k_c, P
     
+@njit(cache=True)
+def contrKrylov(F, g):
+    """
+    Builds the controllability matrix U = [g, Fg, ..., F^(dim-1)g].
+    
+    Compiled with numba when it is available, the matrix-vector products are
+    written as loops, which is faster than np.matmul for small matrices. Only
+    used when numba is installed, contrMatrix uses np.matmul otherwise.
+
+    Parameters
+    ----------
+    F : array of double, size [dim][dim]
+        Discrete system matrix
+    g : array of double, size [dim][1]
+        Discrete input matrix
+
+    Returns
+    -------
+    U : array of double, size [dim][dim]
+        Controllability matrix
+
+    """
+    dim = F.shape[0]
+    U = np.empty((dim, dim))
+    
+    #set first column of U
+    for r in range(dim):
+        U[r, 0] = g[r, 0]
+    
+    #set the remaining columns of U, each is F times the previous column
+    for i in range(1, dim):
+        for r in range(dim):
+            temp = 0.0
+            for j in range(dim):
+                temp += F[r, j]*U[j, i-1]
+            U[r, i] = temp
+    
+    return U
+
+@njit(cache=True)
+def obsKrylov(F, c):
+    """
+    Builds the observability matrix V = [c; cF; ...; cF^(dim-1)].
+    
+    Compiled with numba when it is available, like contrKrylov.
+
+    Parameters
+    ----------
+    F : array of double, size [dim][dim]
+        Discrete system matrix
+    c : array of double, size [1][dim]
+        Discrete output matrix
+
+    Returns
+    -------
+    V : array of double, size [dim][dim]
+        Observability matrix
+
+    """
+    dim = F.shape[0]
+    V = np.empty((dim, dim))
+    
+    #set first row of V
+    for col in range(dim):
+        V[0, col] = c[0, col]
+    
+    #set the remaining rows of V, each is the previous row times F
+    for i in range(1, dim):
+        for col in range(dim):
+            temp = 0.0
+            for j in range(dim):
+                temp += V[i-1, j]*F[j, col]
+            V[i, col] = temp
+    
+    return V
+
+@functools.lru_cache(maxsize=8)
+def contrMatrix(F_bytes, g_bytes, dim):
+    """
+    Calculates the controllability matrix, its determinant and the open loop
+    equation coefficients.
+    
+    The model is passed as bytes so that the results can be cached, pressing
+    calculate again with the same model does not recalculate them. The 
+    returned matrix is shared between calls and is read-only.
+
+    Parameters
+    ----------
+    F_bytes : bytes
+        Discrete system matrix, from F.tobytes() of a float64 array
+    g_bytes : bytes
+        Discrete input matrix, from g.tobytes() of a float64 array
+    dim : int
+        System matrix dimension
+
+    Returns
+    -------
+    U : array of double, size [dim][dim]
+        Controllability matrix
+    signU : double
+        Sign of the determinant, zero if U is singular
+    detU : double
+        Determinant of the controllability matrix
+    ol_coeffs : array of double, size [dim+1]
+        Open loop equation det(zI - F) coefficients, highest power first
+
+    """
+    #rebuild the matrices from the bytes
+    F = np.frombuffer(F_bytes).reshape(dim, dim)
+    g = np.frombuffer(g_bytes).reshape(dim, 1)
+    
+    #build the controllability matrix, the loops are only faster when compiled
+    if jitEnabled:
+        U = contrKrylov(F, g)
+    else:
+        U = np.empty(shape=(dim, dim), dtype=np.float64)
+        
+        #set first column of U
+        U[:, 0] = g[:, 0]
+        
+        #set the remaining columns of U, carrying F^i*g over from the previous column
+        temp = g
+        for i in range(1, dim):
+            temp = F @ temp
+            U[:, i] = temp[:, 0]
+    
+    #slogdet does not overflow or underflow for larger dimensions
+    signU, logdet = np.linalg.slogdet(U)
+    detU = signU*np.exp(logdet)
+    U.flags.writeable = False
+    
+    #get the open loop equation coefficients det(zI - F), highest power first
+    ol_coeffs = np.poly(F)
+    ol_coeffs.flags.writeable = False
+    
+    return U, signU, detU, ol_coeffs
+    
 def checkContr(model, poles, dim):
     """
     Checks the system for controllability. If it is controllable, calculates the 
@@ -137,36 +266,20 @@ def checkContr(model, poles, dim):
 
     """
     #set values from input
-    F = model[0]
-    g = model[1]
-      
-    #initialize controllability matrix
-    U = np.zeros(shape=(dim, dim))
+    F = np.ascontiguousarray(model[0], dtype=np.float64)
+    g = np.ascontiguousarray(model[1], dtype=np.float64)
     
-    #set first row of U
-    for j in range(0, dim):
-        U[j, 0] = g[j, 0]    
-        
-    #set the remaining rows of U
-    for i in range(1, dim):
-        #get F^i 
-        F_new = F      
-        for j in range(1,i):
-            F_new = np.matmul(F_new, F)
-            
-        #set U
-        temp = np.matmul(F_new, g)
-        for j in range(0, dim):
-            U[j, i] = temp[j, 0]
-            
-    #determine controllability and calculate feedback controller if possible        
-    detU = np.linalg.det(U)
+    #get the controllability matrix, cached on the model values
+    U, signU, detU, ol_coeffs = contrMatrix(F.tobytes(), g.tobytes(), dim)
     
-    if not (detU==0):
-        [k, k_c, P] = calcK(F, poles, U, dim)        
+    #determine controllability and calculate feedback controller if possible        
+    #test the sign, a very small determinant can underflow to zero when 
+    #U is not singular
+    if not (signU==0):
+        [k, k_c, P] = calcK(ol_coeffs, poles, U, dim)        
     else:
         print("system not controlable")
-        [k, k_c, P] = [0, 0, 0]
+        [k, k_c, P] = [np.zeros((1, dim)), np.zeros((1, dim)), np.zeros((dim, dim))]
         
     return k, k_c, P, detU
         
@@ -208,6 +321,57 @@ def calcM(model, poles, V):
     m_p = np.array([[2], [2]])
     return m_c, m_p
 
+@functools.lru_cache(maxsize=8)
+def obsMatrix(F_bytes, c_bytes, dim):
+    """
+    Calculates the observability matrix and its determinant.
+    
+    Cached in the same way as contrMatrix, the returned matrix is read-only.
+
+    Parameters
+    ----------
+    F_bytes : bytes
+        Discrete system matrix, from F.tobytes() of a float64 array
+    c_bytes : bytes
+        Discrete output matrix, from c.tobytes() of a float64 array
+    dim : int
+        System matrix dimension
+
+    Returns
+    -------
+    V : array of double, size [dim][dim]
+        Observability matrix
+    signV : double
+        Sign of the determinant, zero if V is singular
+    detV : double
+        Determinant of the observability matrix
+
+    """
+    #rebuild the matrices from the bytes
+    F = np.frombuffer(F_bytes).reshape(dim, dim)
+    c = np.frombuffer(c_bytes).reshape(1, dim)
+    
+    #build the observability matrix, the loops are only faster when compiled
+    if jitEnabled:
+        V = obsKrylov(F, c)
+    else:
+        V = np.empty(shape=(dim, dim), dtype=np.float64)
+        
+        #set first row of V
+        V[0, :] = c[0, :]
+        
+        #set the rest of V, carrying c*F^i over from the previous row
+        temp = c
+        for i in range(1, dim):
+            temp = temp @ F
+            V[i, :] = temp[0, :]
+    
+    signV, logdet = np.linalg.slogdet(V)
+    detV = signV*np.exp(logdet)
+    V.flags.writeable = False
+    
+    return V, signV, detV
+
 def checkObs(model, poles, dim):
     """
     Checks the system for observability. If it is observable, calculates the 
@@ -233,40 +397,40 @@ def checkObs(model, poles, dim):
 
     """
     #set values from input
-    F = model[0]
-    c = model[2]
+    F = np.ascontiguousarray(model[0], dtype=np.float64)
+    c = np.ascontiguousarray(model[2], dtype=np.float64)
     
-    #initialize observability matrix
-    V = np.zeros(shape=(dim, dim))
+    #get the observability matrix, cached on the model values
+    V, signV, detV = obsMatrix(F.tobytes(), c.tobytes(), dim)
     
-    #set first column of V
-    for j in range(0, dim):
-        V[0, j] = c[0,j]    
-        
-    #set the rest of V
-    for i in range(1, dim):
-        #calculate F^i
-        F_new = F
-        for j in range(1,i):
-            F_new = np.matmul(F_new, F)
-            
-        #set V
-        temp = np.matmul(c, F_new)
-        for j in range(0, dim):
-            V[i, j] = temp[0,j]
-            
     #determine observability and calculate observers if possible       
-    detV = np.linalg.det(V)
-    
-    if not (detV==0):
+    if not (signV==0):
         [mc, mp] = calcM(model, poles, V)       
     else:
         print("system not observable")
-        [mc, mp] = [0, 0, 0]
+        [mc, mp] = [np.zeros((dim, 1)), np.zeros((dim, 1))]
         
     return mc, mp, detV
     
 
+def formatMatrix(M):
+    """
+    Formats a matrix as text with one line per row and fixed column widths.
+
+    Parameters
+    ----------
+    M : array of double
+        Matrix (or scalar) to format
+
+    Returns
+    -------
+    string
+        The formatted matrix
+
+    """
+    rows = np.atleast_2d(M).tolist()
+    return "\n".join(" ".join(f"{x:10.4g}" for x in row) for row in rows)
+
 def setLayout(feedback, observer, b_calc_res, dim, frame):
     """
     Displays the results as labels.
@@ -282,7 +446,7 @@ def setLayout(feedback, observer, b_calc_res, dim, frame):
     dim : int
         Maximum dimension of the system model matrices
     frame : ttk.Frame
-        Frame the results should be added to
+        Frame the results should be added to, set up by setupResults
 
     Returns
     -------
@@ -302,29 +466,30 @@ def setLayout(feedback, observer, b_calc_res, dim, frame):
     #construct strings
     str_du = "|U|: \n" + str(detU)
     str_dv = "|V|: \n" + str(detV)
-    str_k = "k: \n" + np.array2string(k)
-    str_k_c = "k_c: \n" + np.array2string(k_c)
-    str_m_c = "m_c: \n" + np.array2string(m_c)
-    str_m_p = "m_p: \n" + np.array2string(m_p)
-    str_p = "P: \n" + np.array2string(P)
-    
-    #initialize labels
-    l_du = ttk.Label(frame, text=str_du)
-    l_dv = ttk.Label(frame, text=str_dv)
-    l_k = ttk.Label(frame, text=str_k)
-    l_kc = ttk.Label(frame, text=str_k_c)
-    l_p = ttk.Label(frame, text=str_p)
-    l_mc = ttk.Label(frame, text=str_m_c)
-    l_mp = ttk.Label(frame, text=str_m_p) 
+    str_k = "k: \n" + formatMatrix(k)
+    str_k_c = "k_c: \n" + formatMatrix(k_c)
+    str_m_c = "m_c: \n" + formatMatrix(m_c)
+    str_m_p = "m_p: \n" + formatMatrix(m_p)
+    str_p = "P: \n" + formatMatrix(P)
+    
+    #update the labels created in setupResults
+    labels = frame._result_labels
+    labels['du'].configure(text=str_du)
+    labels['dv'].configure(text=str_dv)
+    labels['k'].configure(text=str_k)
+    labels['kc'].configure(text=str_k_c)
+    labels['p'].configure(text=str_p)
+    labels['mc'].configure(text=str_m_c)
+    labels['mp'].configure(text=str_m_p)
     
     #display labels
-    l_du.grid(row=0, column=0, pady=2, padx=10)
-    l_dv.grid(row=0, column=1, pady=2, padx=10)
-    l_k.grid(row=1, column=0, pady=2, padx=10)
-    l_kc.grid(row=2, column=0, pady=2, padx=10)
-    l_p.grid(row=3, column=0, pady=2, padx=10)
-    l_mc.grid(row=1, column=1, pady=2, padx=10)
-    l_mp.grid(row=2, column=1, pady=2, padx=10)
+    labels['du'].grid(row=0, column=0, pady=2, padx=10)
+    labels['dv'].grid(row=0, column=1, pady=2, padx=10)
+    labels['k'].grid(row=1, column=0, pady=2, padx=10)
+    labels['kc'].grid(row=2, column=0, pady=2, padx=10)
+    labels['p'].grid(row=3, column=0, pady=2, padx=10)
+    labels['mc'].grid(row=1, column=1, pady=2, padx=10)
+    labels['mp'].grid(row=2, column=1, pady=2, padx=10)
     
     #set button position
     b_calc_res.grid(row=2*dim+2, column=0, pady=2, padx=10)
@@ -351,17 +516,20 @@ def calcRes(b_calc_res, frame):
 
     """
     #get dimensions, poles and model from value_exchange
-    dim = ve.valueExchange.getSize()    
-    model = ve.valueExchange.getModel()    
-    [sigma, wd, T] = ve.valueExchange.getPoles()   
-    poles = [sigma, wd]
-    
-    #calculate the feedback controller and observer
-    feedback = checkContr(model, poles, dim)
-    observer = checkObs(model, poles, dim)  
+    dim = vx.dim
+    model = [vx.F, vx.g, vx.c, vx.d]
+    poles = [vx.z_sigma, vx.z_wd]
+    
+    #calculate the feedback controller and observer, only if the model or 
+    #poles changed since the last calculation
+    if vx.model_dirty or vx.poles_dirty or (vx.feedback is None):
+        vx.feedback = checkContr(model, poles, dim)
+        vx.observer = checkObs(model, poles, dim)
+        vx.model_dirty = False
+        vx.poles_dirty = False
 
     #display the results
-    setLayout(feedback, observer, b_calc_res, dim, frame)    
+    setLayout(vx.feedback, vx.observer, b_calc_res, dim, frame)    
     
 def setupResults(frame):
     """
@@ -380,6 +548,19 @@ def setupResults(frame):
     None.
 
     """
+    #setup the result labels once, they are updated and displayed by setLayout
+    frame._result_labels = {}
+    for name in ['du', 'dv', 'k', 'kc', 'p', 'mc', 'mp']:
+        frame._result_labels[name] = ttk.Label(frame, text="")
+    
     #setup calculate button
     b_calc_res = ttk.Button(frame, text="calculate", command=lambda: calcRes(b_calc_res, frame))
     b_calc_res.grid(row=0, column=0, pady=2, padx=10)
+    
+    #compile the Krylov kernels while the GUI is idle, with read-only inputs
+    #like the ones contrMatrix and obsMatrix pass
+    F = np.frombuffer(np.eye(2).tobytes()).reshape(2, 2)
+    g = np.frombuffer(np.ones(2).tobytes()).reshape(2, 1)
+    c = np.frombuffer(np.ones(2).tobytes()).reshape(1, 2)
+    warmup(contrKrylov, F, g)
+    warmup(obsKrylov, F, c)
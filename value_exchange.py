@@ -4,7 +4,8 @@ Central module that handles the variables needed for controller/observer
 calculations across modules.
 
 The class ValueExchange is used to store the necessary variables as attributes, 
-allowing them to be accessed by any module that imports this one.
+allowing them to be accessed by any module that imports this one. The values 
+are set through the set methods and read directly from the attributes.
 
 REQUIRED MODULES:
     NONE
@@ -13,7 +14,7 @@ EXAMPLE:
     import value_exchange as ve
     
     ve.valueExchange.setPoles(z_sigma, z_wd, T)
-    [sigma, wd, T] = ve.valueExchange.getPoles() 
+    T = ve.valueExchange.T
 
 Created on Thu Mar  2 09:17:59 2023
 
@@ -23,6 +24,10 @@ import numpy as np
 
 class ValueExchange:    
     
+    #fixed attributes, avoids a per instance __dict__
+    __slots__ = ('sigma', 'wd', 'z_sigma', 'z_wd', 'T', 'F', 'g', 'c', 'd', 'dim',
+                 'model_dirty', 'poles_dirty', 'feedback', 'observer')
+    
     def __init__(self, sigma, wd, z_sigma, z_wd, T, F, g, c, d, dim):
         """
         Initializes the ValueExchange class and assigns the initial parameter
@@ -67,6 +72,13 @@ class ValueExchange:
         self.d = d
         self.dim = dim
         
+        #the set methods mark the results as outdated, the results module 
+        #keeps its last feedback controller and observer here
+        self.model_dirty = True
+        self.poles_dirty = True
+        self.feedback = None
+        self.observer = None
+        
     def setRequirements(self, sigma, wd):
         """
         Sets instance requirements.
@@ -123,26 +135,8 @@ class ValueExchange:
         self.z_sigma = z_sigma
         self.z_wd = z_wd
         self.T = T
+        self.poles_dirty = True
         
-    def getPoles(self):
-        """
-        Returns instance poles.
-
-        Returns
-        -------
-        z_sigma : double
-            Discrete sigma value
-        z_wd : double
-            Discrete w_d value
-        T : double
-            Sample time
-
-        """
-        z_sigma = self.z_sigma
-        z_wd = self.z_wd
-        T = self.T
-        return z_sigma, z_wd, T
-
     def setModel(self, F, g, c, d):
         """
         Sets instance model.
@@ -167,29 +161,8 @@ class ValueExchange:
         self.g = g
         self.c = c
         self.d = d
+        self.model_dirty = True
         
-    def getModel(self):
-        """
-        Returns instance model.
-
-        Returns
-        -------
-        F : array of double, size [dim][dim]
-            Discrete system matrix
-        g : array of double, size [dim][1]
-            Discrete input matrix
-        c : array of double, size [1][dim]
-            Discrete output matrix
-        d : double
-            Direct feedthrough term
-
-        """
-        F = self.F
-        g = self.g
-        c = self.c
-        d = self.d
-        return F, g, c, d
-
     def setSize(self, dim):
         """
         Sets instance dimension.
@@ -205,20 +178,8 @@ class ValueExchange:
 
         """
         self.dim = dim
+        self.model_dirty = True
         
-    def getSize(self):
-        """
-        Returns instance dimension.
-
-        Returns
-        -------
-        dim : int
-            Maximum dimension of the system model matrices
-
-        """
-        dim = self.dim
-        return dim
-
 #initialize class
 dim = 1
 F = np.empty(shape=(dim,dim))